@@ -1 +1,5 @@
 COMMAND_PREFIX = "/"
+COMMAND_PREFIX_LENGTH = len(COMMAND_PREFIX)
+RECEIVE_BUFFER_SIZE = 16 * 1024
+MAX_LINE_LENGTH = 64 * 1024
+MAX_SEND_BUFFER = 1024 * 1024
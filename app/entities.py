@@ -1,65 +1,60 @@
 import dataclasses
 import socket
-import typing
-import uuid
-
-from app.enums import EventType
 
 
 Address = tuple[str, int]
-SocketGenerator = typing.Generator[tuple[EventType, socket.socket], None, None]
 
-@dataclasses.dataclass(unsafe_hash=True)
+
+@dataclasses.dataclass(slots=True, eq=False)
 class Client:
-    id: uuid.UUID = dataclasses.field(init=False, hash=True, repr=False, default_factory=uuid.uuid4)
-    username: str = dataclasses.field(init=False, hash=False, repr=True, default=None)
-    __socket: socket.socket = dataclasses.field(hash=False, repr=False)
-    address: Address = dataclasses.field(hash=False, repr=True)
+    username: str = dataclasses.field(init=False, repr=True, default=None)
+    username_prefix: bytes = dataclasses.field(init=False, repr=False, default=b"")
+    __socket: socket.socket = dataclasses.field(repr=False)
+    address: Address = dataclasses.field(repr=True)
+    send_buffer: bytearray = dataclasses.field(init=False, repr=False, default_factory=bytearray)
+    flush_scheduled: bool = dataclasses.field(init=False, repr=False, default=False)
+    closed: bool = dataclasses.field(init=False, repr=False, default=False)
+    active_chat: "Chat | None" = dataclasses.field(init=False, repr=False, default=None)
+    receive_buffer: bytearray = dataclasses.field(init=False, repr=False, default_factory=bytearray)
 
     @property
     def socket(self) -> socket.socket:
         return self.__socket
 
-    def set_username(self, username: str) -> None:
-        self.username = username
-
-    @property
-    def is_registered(self) -> bool:
-        return self.username is not None
-
 
-@dataclasses.dataclass(unsafe_hash=True)
+@dataclasses.dataclass(slots=True, eq=False)
 class Chat:
-    id: uuid.UUID = dataclasses.field(init=False, hash=True, repr=False, default_factory=uuid.uuid4)
-    initiator: Client = dataclasses.field(hash=False, repr=True)
-    target: Client = dataclasses.field(hash=False, repr=True)
+    initiator: Client = dataclasses.field(repr=True)
+    target: Client = dataclasses.field(repr=True)
 
-    is_approved: bool = dataclasses.field(hash=False, repr=True, default=False)
+    is_approved: bool = dataclasses.field(repr=True, default=False)
 
     @property
-    def members(self) -> list:
-        return [self.initiator, self.target]
+    def members(self) -> tuple[Client, Client]:
+        return self.initiator, self.target
 
     def approve(self) -> None:
         self.is_approved = True
 
     def get_second_member(self, client: Client) -> Client:
-        match client:
-            case self.initiator:
-                return self.target
-            case self.target:
-                return self.initiator
-            case _:
-                raise RuntimeError()
+        if client is self.initiator:
+            return self.target
+        if client is self.target:
+            return self.initiator
+        raise RuntimeError()
 
 @dataclasses.dataclass(unsafe_hash=True, frozen=True)
 class MessageCommand:
     prefix = "/"
     command: str
     description: str
-    args: list[str]
+    args: tuple[str, ...]
+    _display: str = dataclasses.field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        command_args_formatted = ", ".join([f"{command_arg}" for command_arg in self.args]) if self.args else "No args"
+        object.__setattr__(self, "_display", f"{self.prefix}{self.command} ({command_args_formatted}) - {self.description}")
 
     @property
     def display(self) -> str:
-        command_args_formatted = ", ".join([f"{command_arg}" for command_arg in self.args]) if self.args else "No args"
-        return f"{self.prefix}{self.command} ({command_args_formatted}) - {self.description}"
+        return self._display
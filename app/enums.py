@@ -17,12 +17,18 @@ class Commands(str, enum.Enum):
     def __new__(cls, value: str, args: list[str] = None, description: str = None):
         member = str.__new__(cls, value)
         member._value_ = value
-        member._args_ = args or []
+        member._args_ = tuple(args) if args else ()
         member._description_ = description or value
+        display_args = " " + ", ".join([f"<{arg}>" for arg in member._args_]) if member._args_ else ""
+        member._display_ = f"{COMMAND_PREFIX}{value}{display_args} - {member._description_}"
         return member
 
+    @classmethod
+    def parse(cls, value: str) -> "Commands | None":
+        return _COMMANDS_BY_VALUE.get(value)
+
     @property
-    def args(self) -> list:
+    def args(self) -> tuple[str, ...]:
         return self._args_
 
     @property
@@ -31,8 +37,10 @@ class Commands(str, enum.Enum):
 
     @property
     def display(self) -> str:
-        args = " " + ", ".join([f"<{arg}>" for arg in self._args_]) if self._args_ else ""
-        return f"{COMMAND_PREFIX}{self._value_}{args} - {self._description_}"
+        return self._display_
+
+
+_COMMANDS_BY_VALUE: dict[str, Commands] = Commands._value2member_map_
 
 
 class EventType(int, enum.Enum):
@@ -3,7 +3,7 @@ import logging
 import structlog
 
 
-def setup_logging() -> None:
+def setup_logging(level: int = logging.INFO) -> None:
     structlog.configure(
         processors=[
             structlog.contextvars.merge_contextvars,
@@ -13,11 +13,11 @@ def setup_logging() -> None:
             structlog.processors.TimeStamper(fmt="%Y-%m-%d %H:%M:%S", utc=False),
             structlog.dev.ConsoleRenderer()
         ],
-        wrapper_class = structlog.make_filtering_bound_logger(logging.NOTSET),
+        wrapper_class = structlog.make_filtering_bound_logger(level),
         context_class = dict,
         logger_factory = structlog.PrintLoggerFactory(),
-        cache_logger_on_first_use = False
+        cache_logger_on_first_use = True
     )
 
-def get_logger(name) -> structlog.stdlib.BoundLogger:
+def get_logger(name) -> structlog.typing.FilteringBoundLogger:
     return structlog.get_logger(name)
@@ -1,3 +1,4 @@
+import logging
 import socket
 
 from app.entities import Client, Chat, Address
@@ -5,12 +6,25 @@ from app.logging import get_logger
 
 
 class ChatRepository:
-    __storage: set[Chat] = set()
     __logger = get_logger("chat_repository")
 
+    def __init__(self) -> None:
+        self.__is_debug_enabled = self.__logger.is_enabled_for(logging.DEBUG)
+        self.__pending_by_pair: dict[tuple[Client, Client], Chat] = {}
+        self.__pending_by_initiator: dict[Client, set[Chat]] = {}
+        self.__pending_by_target: dict[Client, set[Chat]] = {}
+
     def add_chat(self, initiator_client: Client, target_client: Client) -> Chat:
+        chat = self.__pending_by_pair.get((initiator_client, target_client))
+        if chat is not None:
+            if self.__is_debug_enabled:
+                self.__logger.debug("Chat between clients already exists.", chat=chat)
+            return chat
+
         chat = Chat(initiator=initiator_client, target=target_client)
-        self.__storage.add(chat)
+        self.__pending_by_pair[(initiator_client, target_client)] = chat
+        self.__pending_by_initiator.setdefault(initiator_client, set()).add(chat)
+        self.__pending_by_target.setdefault(target_client, set()).add(chat)
         self.__logger.info(
             "Created chat between clients.",
             initiator_client=initiator_client,
@@ -19,86 +33,115 @@ class ChatRepository:
         )
         return chat
 
+    def approve_chat(self, chat: Chat) -> None:
+        self.__discard_pending(chat)
+        chat.approve()
+        chat.initiator.active_chat = chat
+        chat.target.active_chat = chat
+        self.__logger.info("Chat approved.", chat=chat)
+
     def delete_chat(self, chat: Chat) -> None:
-        self.__storage.discard(chat)
+        if chat.is_approved:
+            for member in chat.members:
+                if member.active_chat is chat:
+                    member.active_chat = None
+        else:
+            self.__discard_pending(chat)
         self.__logger.info(
             "Chat removed from storage.",
             chat=chat
         )
 
     def get_active_chat_by_client(self, client: Client) -> Chat | None:
-        active_chat = next((chat for chat in self.__storage if client in chat.members and chat.is_approved), None)
-        self.__logger.debug("Received active chat from storage by client.", client=client, chat=active_chat)
+        active_chat = client.active_chat
+        if self.__is_debug_enabled:
+            self.__logger.debug("Received active chat from storage by client.", client=client, chat=active_chat)
         return active_chat
 
     def get_inactive_chat_by_clients(self, initiator: Client, target: Client) -> Chat | None:
-        inactive_chat = next(
-            (chat for chat in self.__storage if
-             target == chat.target and initiator == chat.initiator and not chat.is_approved),
-            None
-        )
-        self.__logger.debug("Received inactive chat from storage by clients.", initiator=initiator, target=target,
-                            chat=inactive_chat)
+        inactive_chat = self.__pending_by_pair.get((initiator, target))
+        if self.__is_debug_enabled:
+            self.__logger.debug("Received inactive chat from storage by clients.", initiator=initiator, target=target,
+                                chat=inactive_chat)
         return inactive_chat
 
     def get_inactive_chats_by_client(self, client) -> list[Chat] | None:
-        inactive_chats = list(filter(lambda v: v.target == client and not v.is_approved, self.__storage))
-        self.__logger.debug(
-            "Received inactive chats by client",
-            client=client,
-            inactive_chats=inactive_chats
-        )
+        inactive_chats = list(self.__pending_by_target.get(client, ()))
+        if self.__is_debug_enabled:
+            self.__logger.debug(
+                "Received inactive chats by client",
+                client=client,
+                inactive_chats=inactive_chats
+            )
         return inactive_chats
 
     def delete_chats_by_client(self, client: Client):
-        client_chats = [chat for chat in self.__storage if client in chat.members]
+        client_chats = [
+            *self.__pending_by_initiator.get(client, ()),
+            *self.__pending_by_target.get(client, ()),
+        ]
+        active_chat = client.active_chat
+        if active_chat is not None:
+            client_chats.append(active_chat)
         for chat in client_chats:
             self.delete_chat(chat)
 
+    def __discard_pending(self, chat: Chat) -> None:
+        self.__pending_by_pair.pop((chat.initiator, chat.target), None)
+        for index, member in (
+            (self.__pending_by_initiator, chat.initiator),
+            (self.__pending_by_target, chat.target),
+        ):
+            member_chats = index.get(member)
+            if member_chats is None:
+                continue
+            member_chats.discard(chat)
+            if not member_chats:
+                del index[member]
+
 
 class ClientsRepository:
-    __storage: set[Client] = set()
     __logger = get_logger("clients_repository")
 
+    def __init__(self) -> None:
+        self.__is_debug_enabled = self.__logger.is_enabled_for(logging.DEBUG)
+        self.__by_username: dict[str, Client] = {}
+
     def add_client(self, client_socket: socket.socket, client_address: Address,
                      username: str | None = None) -> Client:
         client = Client(client_socket, client_address)
-        self.__storage.add(client)
+        if username is not None:
+            self.rename_client(client, username)
         self.__logger.info(
             "Created client.",
             client=client
         )
         return client
 
-    def get_client_by_socket(self, client_socket: socket.socket) -> Client | None:
-        client = next((client for client in self.__storage if client.socket == client_socket), None)
-        self.__logger.debug(
-            "Received client by socket.",
-            client=client,
-            socket=client_socket
-        )
-        return client
+    def rename_client(self, client: Client, username: str) -> None:
+        if client.username is not None:
+            self.__by_username.pop(client.username, None)
+        client.username = username
+        client.username_prefix = f"{username}: ".encode()
+        self.__by_username[username] = client
 
     def get_client_by_username(self, username: str) -> Client | None:
-        client = next((c for c in self.__storage if c.username == username), None)
-        self.__logger.debug(
-            "Received client by username.",
-            client=client,
-            username=username
-        )
+        client = self.__by_username.get(username)
+        if self.__is_debug_enabled:
+            self.__logger.debug(
+                "Received client by username.",
+                client=client,
+                username=username
+            )
         return client
 
-    def get_registered_clients(self) -> list[Client]:
-        return list(
-            filter(
-                lambda cl: cl.is_registered,
-                self.__storage
-            )
-        )
+    def get_registered_usernames(self) -> list[str]:
+        return list(self.__by_username)
 
     def username_is_used(self, username: str) -> bool:
-        return username in [client.username for client in self.__storage]
+        return username in self.__by_username
 
     def delete_client(self, client: Client) -> None:
-        self.__storage.discard(client)
+        if client.username is not None and self.__by_username.get(client.username) is client:
+            del self.__by_username[client.username]
         self.__logger.info(f"Deleted client from storage.", client=client)
@@ -1,105 +1,129 @@
 import dataclasses
-import select
+import logging
+import selectors
 import socket
 import typing
 from collections import deque
 
 from app.entities import Client
 from app.enums import EventType
-from app.exceptions import ClientDisconnected
 from app.logging import get_logger
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class Event:
-    _socket: socket.socket = dataclasses.field(repr=False)
+    socket: "socket.socket" = dataclasses.field(repr=False)
     type: EventType
-
-    @property
-    def socket(self) -> socket.socket:
-        return self._socket
 Handler = typing.Generator[Event, None, None]
 
 
-@dataclasses.dataclass
-class Task:
-    event: Event
-    handler: Handler
+@dataclasses.dataclass(slots=True)
+class Registration:
+    events: int
+    handlers: dict[int, Handler] = dataclasses.field(default_factory=dict)
 
 
 @dataclasses.dataclass()
 class Scheduler:
-    ready_tasks: deque[Task] = dataclasses.field(default_factory=deque)
-    tasks_waiting_for_read: dict[socket.socket, Task] = dataclasses.field(default_factory=dict)
-    tasks_waiting_for_write: dict[socket.socket, Task] = dataclasses.field(default_factory=dict)
+    ready_tasks: deque[Handler] = dataclasses.field(default_factory=deque)
+    selector: selectors.BaseSelector = dataclasses.field(default_factory=selectors.DefaultSelector)
+    registrations: dict[int, Registration] = dataclasses.field(default_factory=dict)
+    waiting_tasks_count: int = 0
+    is_debug_enabled: bool = dataclasses.field(init=False, repr=False)
 
     __logger = get_logger("scheduler")
 
-    def run(self) -> None:
-        while any([self.ready_tasks, self.tasks_waiting_for_read, self.tasks_waiting_for_write]):
-            self.__logger.debug(
-                "Ready tasks",
-                ready_tasks=self.ready_tasks,
-                tasks_waiting_for_read=self.tasks_waiting_for_read,
-                tasks_waiting_for_write=self.tasks_waiting_for_write
-            )
-            if not self.ready_tasks:
-                self._poll_events()
-
-            task = self._get_next_ready_task()
+    def __post_init__(self) -> None:
+        self.is_debug_enabled = self.__logger.is_enabled_for(logging.DEBUG)
 
-            self._resume_task(task)
+    def run(self) -> None:
+        ready_tasks = self.ready_tasks
+        is_debug_enabled = self.is_debug_enabled
+        poll_events = self._poll_events
+        pop_ready_task = ready_tasks.popleft
+        resume_task = self._resume_task
+
+        while ready_tasks or self.waiting_tasks_count:
+            if is_debug_enabled:
+                self.__logger.debug("Ready tasks", ready_tasks=ready_tasks)
+            if not ready_tasks:
+                poll_events()
+
+            # Tasks queued while this batch runs wait for the next tick.
+            for _ in range(len(ready_tasks)):
+                resume_task(pop_ready_task())
 
     def create_task(self, handler: Handler) -> None:
-        try:
-            event = None
-            task = Task(event=event, handler=handler)
-            self._add_ready_task(task)
-        except StopIteration:
+        self._add_ready_task(handler)
+
+    def _add_ready_task(self, handler: Handler) -> None:
+        self.ready_tasks.append(handler)
+
+    def _register_task(self, event: Event, handler: Handler) -> None:
+        if self.is_debug_enabled:
+            self.__logger.debug("Register task", handler=handler, event_handler=event)
+        event_fd = event.socket.fileno()
+        if event_fd < 0:
+            self.__logger.warning("Dropped task waiting on a closed socket.", handler=handler, event_handler=event)
+            handler.close()
             return
-
-    def _add_ready_task(self, task: Task) -> None:
-        self.ready_tasks.append(task)
-    
-    def _get_next_ready_task(self) -> Task:
-        task = self.ready_tasks.popleft()
-        return task
-
-    def _register_task(self, task: Task) -> None:
-        self.__logger.debug("Register task", task=task)
-        if task.event.type == EventType.READ:
-            self.tasks_waiting_for_read[task.event.socket] = task
-        elif task.event.type == EventType.WRITE:
-            self.tasks_waiting_for_write[task.event.socket] = task
-        else:
-            raise RuntimeError
+        event_mask = event.type.selector_type
+        registration = self.registrations.get(event_fd)
+        if registration is None:
+            registration = self.registrations[event_fd] = Registration(events=event_mask)
+            self.selector.register(event_fd, event_mask, registration)
+        elif not registration.events & event_mask:
+            registration.events |= event_mask
+            self.selector.modify(event_fd, registration.events, registration)
+        if event_mask in registration.handlers:
+            raise RuntimeError(f"Another task is already waiting for {event.type} on fd {event_fd}.")
+        self.waiting_tasks_count += 1
+        registration.handlers[event_mask] = handler
 
     def _poll_events(self) -> None:
-        ready_to_read, ready_to_write, _ = select.select(
-            self.tasks_waiting_for_read,
-            self.tasks_waiting_for_write,
-            []
-        )
-        for ready_task_socket in ready_to_read:
-            self._add_ready_task(
-                self.tasks_waiting_for_read.pop(ready_task_socket)
-            )
-        for ready_task_socket in ready_to_write:
-            self._add_ready_task(
-                self.tasks_waiting_for_write.pop(ready_task_socket)
-            )
-
-    def _resume_task(self, task: Task) -> None:
-        self.__logger.debug("Resume task", task=task)
+        add_ready_task = self._add_ready_task
+        modify = self.selector.modify
+        unregister = self.selector.unregister
+
+        for key, ready_mask in self.selector.select():
+            registration = key.data
+            idle_mask = 0
+            for event_mask in (selectors.EVENT_READ, selectors.EVENT_WRITE):
+                if ready_mask & event_mask:
+                    handler = registration.handlers.pop(event_mask, None)
+                    if handler is None:
+                        idle_mask |= event_mask
+                    else:
+                        self.waiting_tasks_count -= 1
+                        add_ready_task(handler)
+            # HUP/ERR readiness is reported for both masks, including ones that were never registered.
+            idle_mask &= registration.events
+            if not idle_mask:
+                continue
+
+            registration.events &= ~idle_mask
+            if registration.events:
+                modify(key.fileobj, registration.events, registration)
+            else:
+                unregister(key.fileobj)
+                del self.registrations[key.fileobj]
+
+    def _resume_task(self, handler: Handler) -> None:
+        if self.is_debug_enabled:
+            self.__logger.debug("Resume task", handler=handler)
         try:
-            event = next(task.handler)
-            self.__logger.debug("Receive event from task", task=task, event_handler=event)
-            new_task = Task(event=event, handler=task.handler)
-            self._register_task(new_task)
+            event = next(handler)
         except StopIteration:
             return None
+        if self.is_debug_enabled:
+            self.__logger.debug("Receive event from task", handler=handler, event_handler=event)
+        self._register_task(event, handler)
 
     def delete_tasks_by_client(self, client: Client) -> None:
-        self.tasks_waiting_for_read.pop(client.socket, None)
-        self.tasks_waiting_for_write.pop(client.socket, None)
-        self.__logger.debug(f"Deleted client tasks from queue")
\ No newline at end of file
+        client_fd = client.socket.fileno()
+        registration = self.registrations.pop(client_fd, None)
+        if registration is not None:
+            self.waiting_tasks_count -= len(registration.handlers)
+            self.selector.unregister(client_fd)
+        if self.is_debug_enabled:
+            self.__logger.debug(f"Deleted client tasks from queue")
\ No newline at end of file
@@ -1,11 +1,14 @@
+import errno
 import logging
-import select
+import os
 import socket
+import stat
 import typing
-from collections import deque
 
-from app.constants import COMMAND_PREFIX
-from app.entities import Chat, Client, SocketGenerator, Address
+from structlog.typing import FilteringBoundLogger
+
+from app.constants import COMMAND_PREFIX, COMMAND_PREFIX_LENGTH, MAX_LINE_LENGTH, MAX_SEND_BUFFER, RECEIVE_BUFFER_SIZE
+from app.entities import Chat, Client
 from app.enums import Commands, EventType
 from app.exceptions import ClientDisconnected
 from app.logging import get_logger
@@ -13,20 +16,65 @@ from app.repositories import ClientsRepository, ChatRepository
 from app.scheduler import Scheduler, Event
 
 
+_MSG_GREETING = b"Hi! Write your username.\n"
+_MSG_USERNAME_IN_USE = b"Username is already in use, try another one:\n"
+_MSG_INVALID_ARGS = b"Invalid command args.\n"
+_MSG_NO_CHAT = b"You are not consistent with any chat.\n"
+_MSG_CONNECT_TO_SELF = b"Client is trying to connect to itself.\n"
+_MSG_CLIENT_DISCONNECTED = b"Client may be disconnected.\n"
+_MSG_NO_CLIENTS = b"No available clients.\n"
+_MSG_NO_ACTIVE_CHAT_NOW = b"You have no active chat now.\n"
+_MSG_NO_ACTIVE_CHATS = b"You do not have active chats.\n"
+_MSG_APPROVE_SELF = b"You are trying to approve a chat with yourself.\n"
+_MSG_INITIATOR_DISCONNECTED = b"Chat initiator may be disconnected.\n"
+_MSG_DECLINE_SELF = b"You are trying to decline a chat with yourself.\n"
+_MSG_NO_REQUESTS = b"You not have chat requests\n"
+
+
 class Server:
 
-    def __init__(self, host: str = 'localhost', port: int = 50_000, logger: logging.Logger = None) -> None:
+    def __init__(
+        self,
+        host: str = 'localhost',
+        port: int = 50_000,
+        logger: FilteringBoundLogger | None = None,
+        unix_path: str | None = None,
+        socket_buffer_size: int | None = None,
+        reuse_port: bool = False,
+    ) -> None:
         self._logger = logger or get_logger("app.server")
+        self.__is_debug_enabled = self._logger.is_enabled_for(logging.DEBUG)
         self.__host = host
         self.__port = port
-
-        self.__socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.__socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        self.__socket.bind((self.__host, self.__port))
+        self.__unix_path = unix_path
+
+        if self.__unix_path is not None:
+            self.__remove_stale_unix_socket_file()
+            self.__socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.__socket.bind(self.__unix_path)
+            bound_stat = os.stat(self.__unix_path)
+            self.__unix_socket_id = (bound_stat.st_dev, bound_stat.st_ino)
+        else:
+            self.__socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.__socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            if reuse_port:
+                self.__socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+            self.__socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.__socket.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            # Accepted sockets inherit these; setting them turns off the kernel's buffer autotuning.
+            if socket_buffer_size is not None:
+                self.__socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, socket_buffer_size)
+                self.__socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, socket_buffer_size)
+                self._logger.info(
+                    "Configured socket buffers.",
+                    send_buffer_size=self.__socket.getsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF),
+                    receive_buffer_size=self.__socket.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF),
+                )
+            self.__socket.bind((self.__host, self.__port))
+        self.__socket.setblocking(False)
 
         self.__clients_repo: ClientsRepository = ClientsRepository()
         self.__chats_repo: ChatRepository = ChatRepository()
-        self.__buffer_size: int = 4096
         self.__commands: dict[Commands, typing.Callable] = {
             Commands.GET_CLIENTS: self.__execute_list_clients_command,
             Commands.CONNECT_TO_CLIENT: self.__execute_connect_command,
@@ -37,307 +85,435 @@ class Server:
             Commands.REQUESTS: self.__execute_requests_command,
             Commands.HELP: self.__execute_help_command,
         }
+        self.__command_index: dict[str, tuple[Commands, typing.Callable, int]] = {
+            command.value: (command, handler, len(command.args)) for command, handler in self.__commands.items()
+        }
+        self.__help_message_bytes = (
+            "Available commands:\n" + "\n".join(cmd.display for cmd in self.__commands) + "\n"
+        ).encode()
 
         self.__scheduler = Scheduler()
+        self.__receive_scratch = memoryview(bytearray(RECEIVE_BUFFER_SIZE))
 
     # SERVER METHODS
+    @classmethod
+    def run_forked(cls, workers: int, host: str = 'localhost', port: int = 50_000) -> None:
+        # TCP only: processes cannot share one Unix socket path, so unix_path is not taken here.
+        for _ in range(workers - 1):
+            if os.fork() == 0:
+                break
+        cls(host, port, reuse_port=True).run()
+
     def run(self) -> None:
-        self.__socket.listen()
-        self._logger.info("Running server.", server_host=self.__host, server_port=self.__port)
+        self.__socket.listen(socket.SOMAXCONN)
+        if self.__unix_path is not None:
+            self._logger.info("Running server.", server_path=self.__unix_path)
+        else:
+            self._logger.info("Running server.", server_host=self.__host, server_port=self.__port)
 
         self.__scheduler.create_task(self.__handle_client_connection())
-        self.__scheduler.run()
+        try:
+            self.__scheduler.run()
+        finally:
+            if self.__unix_path is not None:
+                self.__remove_unix_socket_file()
 
     def __handle_client_connection(self) -> typing.Generator[Event]:
         while True:
             yield Event(self.__socket, EventType.READ)
-            client_socket, client_address = self.__socket.accept()
-            client = self.__clients_repo.add_client(client_socket, client_address, None)
-            yield from self.__send_message_to_client(client, "Hi! Write your username.")
-            self.__scheduler.create_task(self.__handle_register_client(client))
-
-    def __handle_client_command(self, client: Client, raw_command: str, command_args: list[str]) -> typing.Generator[Event]:
-        self._logger.debug(
-            "Handle command from the client.",
-            client=client,
-            raw_command=raw_command,
-            command_args=command_args,
-        )
-        try:
-            parsed_command = Commands(raw_command)
-            self._logger.debug(
-                "Parsed command from the client.",
-                client=client,
-                parsed_command=parsed_command,
-                command_args=command_args,
-            )
-        except ValueError:
+            while True:
+                try:
+                    client_socket, client_address = self.__socket.accept()
+                except BlockingIOError:
+                    break
+                except ConnectionAbortedError:
+                    continue
+                except OSError as error:
+                    if error.errno not in (errno.EMFILE, errno.ENFILE):
+                        raise
+                    self._logger.warning("Cannot accept clients, out of file descriptors.", error=str(error))
+                    break
+                client_socket.setblocking(False)
+                client = self.__clients_repo.add_client(client_socket, client_address, None)
+                self.__scheduler.create_task(self.__handle_register_client(client))
+
+    def __handle_client_command(self, client: Client, raw_command: str, command_tail: str) -> None:
+        if self.__is_debug_enabled:
             self._logger.debug(
-                "Failed to parse the command from the client.",
+                "Handle command from the client.",
                 client=client,
                 raw_command=raw_command,
-                command_args=command_args,
+                command_tail=command_tail,
             )
-            yield from self.__send_message_to_client(client, f"Unknown command: {raw_command}.")
-            return
-
-        if parsed_command not in self.__commands:
-            self._logger.debug(
-                "The command is not supported by the server.",
-                client=client,
-                parsed_command=parsed_command
-            )
-            yield from self.__send_message_to_client(client, f"Command not supported: {raw_command}.")
+        command_entry = self.__command_index.get(raw_command)
+        if command_entry is None:
+            parsed_command = Commands.parse(raw_command)
+            if parsed_command is None:
+                if self.__is_debug_enabled:
+                    self._logger.debug(
+                        "Failed to parse the command from the client.",
+                        client=client,
+                        raw_command=raw_command,
+                        command_tail=command_tail,
+                    )
+                self.__send_message_to_client(client, f"Unknown command: {raw_command}.")
+            else:
+                if self.__is_debug_enabled:
+                    self._logger.debug(
+                        "The command is not supported by the server.",
+                        client=client,
+                        parsed_command=parsed_command
+                    )
+                self.__send_message_to_client(client, f"Command not supported: {raw_command}.")
             return
 
-        handler = self.__commands[parsed_command]
-        self._logger.debug("Handler received for the command", handler=handler.__name__, parsed_command=parsed_command)
+        parsed_command, handler, args_count = command_entry
+        if self.__is_debug_enabled:
+            self._logger.debug("Handler received for the command", handler=handler.__name__, parsed_command=parsed_command)
 
-        if parsed_command.args:
-            if command_args and len(command_args) == len(parsed_command.args):
-                yield from handler(client, *command_args)
+        if args_count:
+            # One extra split is enough to tell that too many args were given.
+            command_args = command_tail.split(maxsplit=args_count)
+            if len(command_args) == args_count:
+                handler(client, *command_args)
             else:
-                self._logger.debug(
-                    "Handler received command with invalid args",
-                    handler=handler.__name__,
-                    parsed_command=parsed_command,
-                    command_args=command_args
-                )
-                yield from self.__send_message_to_client(client, "Invalid command args.")
+                if self.__is_debug_enabled:
+                    self._logger.debug(
+                        "Handler received command with invalid args",
+                        handler=handler.__name__,
+                        parsed_command=parsed_command,
+                        command_args=command_args
+                    )
+                self.__send_bytes_to_client(client, _MSG_INVALID_ARGS)
         else:
-            yield from handler(client)
+            handler(client)
 
     def __handle_client_message(self, client: Client) -> typing.Generator[Event]:
+        read_event = Event(client.socket, EventType.READ)
+        receive_line_from_client = self.__receive_line_from_client
+        handle_client_command = self.__handle_client_command
+        handle_chat_message = self.__handle_chat_message
+        is_debug_enabled = self.__is_debug_enabled
+        log_debug = self._logger.debug
+
         while True:
             try:
-                yield Event(client.socket, EventType.READ)
-                client_message = self.__receive_from_client_safe(client).decode()
+                client_message = yield from receive_line_from_client(client, read_event)
             except ClientDisconnected:
                 return
 
-            self._logger.debug("Received message from client", client=client, message=client_message)
+            if is_debug_enabled:
+                log_debug("Received message from client", client=client, message=client_message)
 
             if not client_message:
-                self.__disconnect_client(client)
-                return
+                continue
 
             if client_message.startswith(COMMAND_PREFIX):
-                raw_command, *command_args = client_message.replace(COMMAND_PREFIX, '').split()
-                yield from self.__handle_client_command(client, raw_command, command_args)
+                raw_command, *command_tail = client_message[COMMAND_PREFIX_LENGTH:].split(maxsplit=1) or [""]
+                handle_client_command(client, raw_command, command_tail[0] if command_tail else "")
                 continue
 
-            if self.__chats_repo.get_active_chat_by_client(client) is not None:
-                yield from self.__handle_chat_message(client, client_message)
+            chat = client.active_chat
+            if chat is not None:
+                handle_chat_message(client, chat, client_message)
             else:
-                yield from self.__send_message_to_client(client, f"You are not consistent with any chat.")
+                self.__send_bytes_to_client(client, _MSG_NO_CHAT)
 
-            self._logger.info(f"handle {client} message: {client_message}")
+            if is_debug_enabled:
+                log_debug("Handled client message.", client=client, message=client_message)
 
-    def __handle_chat_message(self, client: Client, message: str) -> typing.Generator[Event]:
-        chat = self.__chats_repo.get_active_chat_by_client(client)
-        if not chat:
-            return
+    def __handle_chat_message(self, client: Client, chat: Chat, message: str) -> None:
         second_member = chat.get_second_member(client)
 
-        yield from self.__send_message_to_client(second_member, f"{client.username}: {message.strip()}")
+        send_buffer = second_member.send_buffer
+        send_buffer += client.username_prefix
+        send_buffer += message.strip().encode()
+        send_buffer += b"\n"
+        self.__schedule_flush(second_member)
 
     def __handle_register_client(self, client: Client) -> typing.Generator[Event]:
+        self.__send_bytes_to_client(client, _MSG_GREETING)
+        read_event = Event(client.socket, EventType.READ)
         while True:
             try:
-                yield Event(client.socket, EventType.READ)
-                username = self.__receive_from_client_safe(client).decode().strip()
+                username = (yield from self.__receive_line_from_client(client, read_event)).strip()
             except ClientDisconnected:
                 return
 
             username_is_used = self.__clients_repo.username_is_used(username)
             if username_is_used:
                 self._logger.info(f"Client already exists.", client=client, input_username=username)
-                self.__scheduler.create_task(self.__send_message_to_client(client, "Username is already in use, try another one:"))
+                self.__send_bytes_to_client(client, _MSG_USERNAME_IN_USE)
                 continue
 
-            client.set_username(username)
+            self.__clients_repo.rename_client(client, username)
 
             self._logger.info(f"Registered new client.", client=client)
-            yield from self.__execute_help_command(client)
-            self.__scheduler.create_task(self.__handle_client_message(client))
-            break
+            self.__execute_help_command(client)
+            # Continue in this task so the client is never left without a reader between the two loops.
+            yield from self.__handle_client_message(client)
+            return
 
-    def __execute_help_command(self, client: Client) -> typing.Generator[Event]:
-        message = "Available commands:\n"
-        for cmd in self.__commands:
-            message += cmd.display + '\n'
-        yield from self.__send_message_to_client(client, message.strip())
+    def __execute_help_command(self, client: Client) -> None:
+        self.__send_bytes_to_client(client, self.__help_message_bytes)
 
-    def __execute_connect_command(self, initiator_client: Client, target_client_username: str) -> typing.Generator[Event]:
+    def __execute_connect_command(self, initiator_client: Client, target_client_username: str) -> None:
         if initiator_client.username == target_client_username:
-            yield from self.__send_message_to_client(initiator_client, "Client is trying to connect to itself.")
+            self.__send_bytes_to_client(initiator_client, _MSG_CONNECT_TO_SELF)
             return
 
         active_client_chat = self.__chats_repo.get_active_chat_by_client(initiator_client)
         if active_client_chat is not None:
             second_member = active_client_chat.get_second_member(initiator_client)
-            yield from self.__send_message_to_client(initiator_client, f"You already in chat with {second_member.username}.")
+            self.__send_message_to_client(initiator_client, f"You already in chat with {second_member.username}.")
             return
 
         target_client = self.__clients_repo.get_client_by_username(target_client_username)
         if not target_client:
-            yield from self.__send_message_to_client(initiator_client, "Client may be disconnected.")
+            self.__send_bytes_to_client(initiator_client, _MSG_CLIENT_DISCONNECTED)
             return
 
         self.__chats_repo.add_chat(initiator_client, target_client)
-        yield from self.__send_message_to_client(target_client, f"{initiator_client.username} wants to start a chat with you.")
-
-    def __execute_list_clients_command(self, client: Client) -> typing.Generator[Event]:
-        clients_list_message = "\n".join(
-            [
-                current_client.username for current_client in filter(
-                    lambda cl: cl.username != client.username,
-                    self.__clients_repo.get_registered_clients()
-                )
-            ]
-        )
+        self.__send_message_to_client(target_client, f"{initiator_client.username} wants to start a chat with you.")
+
+    def __execute_list_clients_command(self, client: Client) -> None:
+        usernames = self.__clients_repo.get_registered_usernames()
+        usernames.remove(client.username)
+        clients_list_message = "\n".join(usernames)
         if not clients_list_message:
-            clients_list_message = "No available clients."
+            self.__send_bytes_to_client(client, _MSG_NO_CLIENTS)
+            return
 
-        yield from self.__send_message_to_client(client, clients_list_message)
+        self.__send_message_to_client(client, clients_list_message)
 
-    def __execute_disconnect_command(self, client: Client) -> typing.Generator[Event]:
+    def __execute_disconnect_command(self, client: Client) -> None:
         current_chat = self.__chats_repo.get_active_chat_by_client(client)
 
         if current_chat is None:
-            yield from self.__send_message_to_client(client, "You have no active chat now.")
+            self.__send_bytes_to_client(client, _MSG_NO_ACTIVE_CHAT_NOW)
             return
 
         self.__chats_repo.delete_chat(current_chat)
 
-        for member in current_chat.members:
-            second_member = current_chat.get_second_member(member)
-            yield from self.__send_message_to_client(member, f"Chat with {second_member.username} ended.")
+        initiator, target = current_chat.initiator, current_chat.target
+        self.__send_message_to_client(initiator, f"Chat with {target.username} ended.")
+        self.__send_message_to_client(target, f"Chat with {initiator.username} ended.")
 
-    def __execute_chat_info_command(self, client) -> typing.Generator[Event]:
+    def __execute_chat_info_command(self, client) -> None:
         chat = self.__chats_repo.get_active_chat_by_client(client)
         if chat is None:
-            yield from self.__send_message_to_client(client, "You do not have active chats.")
+            self.__send_bytes_to_client(client, _MSG_NO_ACTIVE_CHATS)
             return
 
         second_member = chat.get_second_member(client)
-        yield from self.__send_message_to_client(client, f"You have active chat with {second_member.username}.")
+        self.__send_message_to_client(client, f"You have active chat with {second_member.username}.")
 
-    def __execute_approve_chat_command(self, client: Client, username: str) -> typing.Generator[Event]:
+    def __execute_approve_chat_command(self, client: Client, username: str) -> None:
         if client.username == username:
-            self._logger.debug("Client is trying to approve a chat with himself.", client=client)
-            yield from self.__send_message_to_client(client, "You are trying to approve a chat with yourself.")
+            if self.__is_debug_enabled:
+                self._logger.debug("Client is trying to approve a chat with himself.", client=client)
+            self.__send_bytes_to_client(client, _MSG_APPROVE_SELF)
             return
 
         active_client_chat = self.__chats_repo.get_active_chat_by_client(client)
         if active_client_chat is not None:
             second_member = active_client_chat.get_second_member(client)
-            self._logger.debug("The client already has an active chat.", client=client, chat=active_client_chat)
-            yield from self.__send_message_to_client(client, f"You already has an active chat with {second_member.username}.")
+            if self.__is_debug_enabled:
+                self._logger.debug("The client already has an active chat.", client=client, chat=active_client_chat)
+            self.__send_message_to_client(client, f"You already has an active chat with {second_member.username}.")
             return
 
         chat_initiator = self.__clients_repo.get_client_by_username(username)
         if not chat_initiator:
-            self._logger.debug("Chat initiator not found.", username=username)
-            yield from self.__send_message_to_client(client, "Chat initiator may be disconnected.")
+            if self.__is_debug_enabled:
+                self._logger.debug("Chat initiator not found.", username=username)
+            self.__send_bytes_to_client(client, _MSG_INITIATOR_DISCONNECTED)
             return
 
         current_initiator_chat = self.__chats_repo.get_active_chat_by_client(chat_initiator)
         if current_initiator_chat is not None:
-            self._logger.debug("Chat initiator already has an active chat.", chat_initiator=chat_initiator, chat=current_initiator_chat)
-            yield from self.__send_message_to_client(client, f"{chat_initiator.username} already has an active chat.")
+            if self.__is_debug_enabled:
+                self._logger.debug("Chat initiator already has an active chat.", chat_initiator=chat_initiator, chat=current_initiator_chat)
+            self.__send_message_to_client(client, f"{chat_initiator.username} already has an active chat.")
             return
 
         inactive_chat = self.__chats_repo.get_inactive_chat_by_clients(chat_initiator, client)
         if inactive_chat:
-            inactive_chat.approve()
-            self._logger.info("Chat approved.", chat=inactive_chat)
-            yield from self.__send_message_to_client(
+            self.__chats_repo.approve_chat(inactive_chat)
+            self.__send_message_to_client(
                 inactive_chat.initiator,
                 f"You started a chat with {inactive_chat.target.username}."
             )
-            yield from self.__send_message_to_client(
+            self.__send_message_to_client(
                 inactive_chat.target,
                 f"You started a chat with {inactive_chat.initiator.username}."
             )
         else:
             self._logger.info("Clients have no inactive chat.", initiator=chat_initiator, target=client, chat=inactive_chat)
-            yield from self.__send_message_to_client(
+            self.__send_message_to_client(
                 client,
                 f"You have no chat request from {username}."
             )
 
-    def __execute_decline_chat_command(self, client: Client, username: str) -> typing.Generator[Event]:
+    def __execute_decline_chat_command(self, client: Client, username: str) -> None:
         if client.username == username:
-            self._logger.debug("Client is trying to decline a chat with himself.", client=client)
-            yield from self.__send_message_to_client(client, "You are trying to decline a chat with yourself.")
+            if self.__is_debug_enabled:
+                self._logger.debug("Client is trying to decline a chat with himself.", client=client)
+            self.__send_bytes_to_client(client, _MSG_DECLINE_SELF)
             return
 
         chat_initiator = self.__clients_repo.get_client_by_username(username)
         if not chat_initiator:
-            self._logger.debug("Chat initiator not found.", username=username)
-            yield from self.__send_message_to_client(client, "Chat initiator may be disconnected.")
+            if self.__is_debug_enabled:
+                self._logger.debug("Chat initiator not found.", username=username)
+            self.__send_bytes_to_client(client, _MSG_INITIATOR_DISCONNECTED)
             return
 
         inactive_chat = self.__chats_repo.get_inactive_chat_by_clients(chat_initiator, client)
         if inactive_chat:
             self.__chats_repo.delete_chat(inactive_chat)
             self._logger.info("Chat declined.", chat=inactive_chat)
-            yield from self.__send_message_to_client(
+            self.__send_message_to_client(
                 inactive_chat.target,
                 f"You declined a chat request from {inactive_chat.initiator.username}."
             )
-            yield from self.__send_message_to_client(
+            self.__send_message_to_client(
                 inactive_chat.initiator,
                 f"{inactive_chat.target.username} declined your chat request."
             )
         else:
             self._logger.info("Clients have no inactive chat.", initiator=chat_initiator, target=client, chat=inactive_chat)
-            yield from self.__send_message_to_client(
+            self.__send_message_to_client(
                 client,
                 f"You have no chat request from {username}."
             )
 
-    def __execute_requests_command(self, client) -> typing.Generator[Event]:
+    def __execute_requests_command(self, client) -> None:
         inactive_chats = self.__chats_repo.get_inactive_chats_by_client(client)
         if not inactive_chats:
-            message = "You not have chat requests"
-        else:
-            message = "Chat requests from:\n"
-            for i, inactive_chat in enumerate(inactive_chats, start=1):
-                message += f"{i}. {inactive_chat.initiator.username}\n"
+            self.__send_bytes_to_client(client, _MSG_NO_REQUESTS)
+            return
 
-        yield from self.__send_message_to_client(client, message.strip())
+        message = "Chat requests from:\n" + "\n".join(
+            f"{i}. {inactive_chat.initiator.username}" for i, inactive_chat in enumerate(inactive_chats, start=1)
+        )
+        self.__send_message_to_client(client, message)
 
     # HELP METHODS
+    def __remove_stale_unix_socket_file(self) -> None:
+        try:
+            if not stat.S_ISSOCK(os.stat(self.__unix_path).st_mode):
+                return
+        except FileNotFoundError:
+            return
+
+        probe_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe_socket.connect(self.__unix_path)
+        except ConnectionRefusedError:
+            self._logger.info("Removing stale unix socket file.", server_path=self.__unix_path)
+            os.unlink(self.__unix_path)
+            return
+        finally:
+            probe_socket.close()
+        raise OSError(errno.EADDRINUSE, os.strerror(errno.EADDRINUSE), self.__unix_path)
+
+    def __remove_unix_socket_file(self) -> None:
+        try:
+            path_stat = os.stat(self.__unix_path)
+        except FileNotFoundError:
+            return
+        # Another server may have taken the path over since; only remove the socket this server bound.
+        if (path_stat.st_dev, path_stat.st_ino) == self.__unix_socket_id:
+            os.unlink(self.__unix_path)
+
     def __disconnect_client(self, client: Client) -> None:
-        self._logger.info(f"Dicsonnect client {client}")
+        if client.closed:
+            return
+        self._logger.info("Disconnect client.", client=client)
 
         self.__chats_repo.delete_chats_by_client(client)
         self.__clients_repo.delete_client(client)
         self.__scheduler.delete_tasks_by_client(client)
+        client.send_buffer.clear()
+        client.receive_buffer.clear()
 
+        client.closed = True
         client.socket.close()
 
-    def __receive_from_client_safe(self, client: Client) -> bytes:
+    def __receive_line_from_client(self, client: Client, read_event: Event) -> typing.Generator[Event, None, str]:
+        receive_buffer = client.receive_buffer
+        search_start = 0
+        while (line_end := receive_buffer.find(b"\n", search_start)) < 0 and len(receive_buffer) <= MAX_LINE_LENGTH:
+            if client.closed:
+                raise ClientDisconnected(client)
+            search_start = len(receive_buffer)
+            yield read_event
+            self.__receive_from_client_safe(client)
+        if line_end < 0 or line_end > MAX_LINE_LENGTH:
+            self._logger.info("Client line is too long.", client=client, buffered_bytes=len(receive_buffer))
+            self.__disconnect_client(client)
+            raise ClientDisconnected(client)
+        line = receive_buffer[:line_end].decode(errors="replace")
+        del receive_buffer[:line_end + 1]
+        return line
+
+    def __receive_from_client_safe(self, client: Client) -> None:
+        if client.closed:
+            raise ClientDisconnected(client)
         try:
-            client_data = client.socket.recv(self.__buffer_size)
-            if not client_data:
+            received = client.socket.recv_into(self.__receive_scratch)
+            if not received:
                 self.__disconnect_client(client)
-                self._logger.debug("The client turned off", client=client)
+                if self.__is_debug_enabled:
+                    self._logger.debug("The client turned off", client=client)
                 raise ClientDisconnected(client)
-            self._logger.debug(f"Received data from client", client=client, client_data=client_data)
-            return client_data
-        except ConnectionResetError:
+            client.receive_buffer += self.__receive_scratch[:received]
+            if self.__is_debug_enabled:
+                self._logger.debug(f"Received data from client", client=client, received_bytes=received)
+        except (ConnectionError, TimeoutError):
             self.__disconnect_client(client)
-            self._logger.debug("Client reset connection.", client=client)
+            if self.__is_debug_enabled:
+                self._logger.debug("Client reset connection.", client=client)
             raise ClientDisconnected(client)
 
-    def __send_message_to_client(self, client: Client, message: str) -> typing.Generator[Event]:
-        yield Event(client.socket, EventType.WRITE)
-        self._logger.debug("Sending a message to the client.", client=client, message=message)
-        try:
-            client.socket.send(message.encode() + b"\n")
-            self._logger.info("Message sent to the client.", client=client, message=message)
-        except ConnectionResetError:
+    def __send_message_to_client(self, client: Client, message: str) -> None:
+        if self.__is_debug_enabled:
+            self._logger.debug("Sending a message to the client.", client=client, message=message)
+        send_buffer = client.send_buffer
+        send_buffer += message.encode()
+        send_buffer += b"\n"
+        self.__schedule_flush(client)
+
+    def __send_bytes_to_client(self, client: Client, payload: bytes) -> None:
+        client.send_buffer += payload
+        self.__schedule_flush(client)
+
+    def __schedule_flush(self, client: Client) -> None:
+        if client.closed:
+            client.send_buffer.clear()
+            return
+        # A client that does not read its replies must not make the server buffer them without limit.
+        if len(client.send_buffer) > MAX_SEND_BUFFER:
+            self._logger.info("Client send buffer overflow.", client=client, buffered_bytes=len(client.send_buffer))
             self.__disconnect_client(client)
+            return
+        if not client.flush_scheduled:
+            client.flush_scheduled = True
+            self.__scheduler.create_task(self.__flush_client(client))
+
+    def __flush_client(self, client: Client) -> typing.Generator[Event]:
+        send_buffer = client.send_buffer
+        while send_buffer and not client.closed:
+            try:
+                sent = client.socket.send(send_buffer)
+            except BlockingIOError:
+                yield Event(client.socket, EventType.WRITE)
+                continue
+            except (ConnectionError, TimeoutError):
+                self.__disconnect_client(client)
+                return
+            if self.__is_debug_enabled:
+                self._logger.debug("Message sent to the client.", client=client, sent_bytes=sent)
+            del send_buffer[:sent]
+        client.flush_scheduled = False